@@ -1,219 +1,102 @@
 import io
 import re
 import math
-import unicodedata
+import json
+from datetime import datetime
+
 import pandas as pd
 import streamlit as st
 
+from no_show_engine import (
+    REGRAS_EMBUTIDAS,
+    build_rules_map,
+    conferir_duplas,
+    contar_valores,
+    juntar_por_chave,
+    mesclar_regras,
+    pagina,
+    posicoes_filtradas,
+    read_any,
+    read_any_loose,
+    rotulo_dupla,
+    validar_dataframe,
+)
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
 st.set_page_config(page_title="Validador de No-show — PT-BR", layout="wide")
 st.title("Validador de No-show — PT-BR")
 
-# ============================================================
-# Regras embutidas (modelos oficiais de causa/motivo/máscara)
-# -> Base normalizada a partir das regras enviadas
-# ============================================================
-REGRAS_EMBUTIDAS = [
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Alteração do tipo de serviço – De assistência para reinstalação",
-        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 foi informado sobre a necessidade de reagendamento."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Atendimento Improdutivo – Ponto Fixo/Móvel",
-        "mascara_modelo": "Veículo compareceu para atendimento, porém por 0, não foi possível realizar o serviço."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Cancelada a Pedido do Cliente",
-        "mascara_modelo": "Cliente 0 , contato via 0 em 0 - 0, informou indisponibilidade para o atendimento."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Cancelamento a pedido da RT",
-        "mascara_modelo": "Acordado novo agendamento com o cliente 0 no dia 0, via 0 - 0, pelo motivo - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Cronograma de Instalação/Substituição de Placa",
-        "mascara_modelo": "Realizado atendimento com substituição de placa. Alteração feita pela OS 0."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Erro De Agendamento - Cliente desconhecia o agendamento",
-        "mascara_modelo": "Em contato com o cliente o mesmo informou que desconhecia o agendamento. Nome cliente: 0 / Data contato: 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Erro de Agendamento – Endereço incorreto",
-        "mascara_modelo": "Erro identificado no agendamento: 0 . Situação: 0. Cliente 0 - informado em 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Erro de Agendamento – Falta de informações na O.S.",
-        "mascara_modelo": "OS agendada apresentou erro de 0 e foi identificado através de 0. Realizado o contato com o cliente 0 - no dia 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Erro de Agendamento – O.S. agendada incorretamente (tipo/motivo/produto)",
-        "mascara_modelo": "OS agendada apresentou erro de 0 e foi identificado através de 0. Realizado o contato com o cliente 0 - no dia 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Erro de roteirização do agendamento - Atendimento móvel",
-        "mascara_modelo": "Não foi possível concluir o atendimento devido 0 . Cliente às 0 - 0 foi informado sobre a necessidade de reagendamento. Especialista 0 informado às 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Falta De Equipamento - Acessórios Imobilizado",
-        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Falta De Equipamento - Item Reservado Não Compatível",
-        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Falta De Equipamento - Material",
-        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Falta De Equipamento - Principal",
-        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Instabilidade de Equipamento/Sistema",
-        "mascara_modelo": "Atendimento finalizado em 0 não concluído devido à instabilidade de 0. Registrado teste/reinstalação em 0 - 0. Realizado contato com a central 0 - 0 e foi gerada a ASM 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "No-show Cliente – Ponto Fixo/Móvel",
-        "mascara_modelo": "Cliente não compareceu para atendimento até às 0."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "No-show Técnico",
-        "mascara_modelo": "Técnico 0 , em 0 - 0, não realizou o atendimento por motivo de 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Ocorrência com Técnico – Não foi possível realizar atendimento",
-        "mascara_modelo": "Técnico 0 , em 0 - 0, não realizou o atendimento por motivo de 0"
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Ocorrência Com Técnico - Sem Tempo Hábil Para Realizar O Serviço (Atendimento Parcial)",
-        "mascara_modelo": "Não foi possível concluir o atendimento devido 0 . Cliente 0 às 0 - 0 foi informado sobre a necessidade de reagendamento."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Ocorrência Com Técnico - Sem Tempo Hábil Para Realizar O Serviço (Não iniciado)",
-        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 - informado do reagendamento."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Ocorrência Com Técnico - Técnico Sem Habilidade Para Realizar Serviço",
-        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 foi informado sobre a necessidade de reagendamento."
-    },
-    {
-        "causa": "Agendamento cancelado.",
-        "motivo": "Perda/Extravio/Falta Do Equipamento/Equipamento Com Defeito",
-        "mascara_modelo": "Não foi possível realizar o atendimento pois 0. Cliente recusou assinar termo."
-    }
-]
-
-# ------------------------------------------------------------
-# UTILITÁRIOS (normalização + regex tolerante)
-# ------------------------------------------------------------
-def rm_acc(s: str) -> str:
-    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-
-def canon(s: str) -> str:
-    if pd.isna(s):
-        return ""
-    s = str(s)
-    s = s.replace("–", "-").replace("—", "-")
-    s = rm_acc(s).lower()
-    s = re.sub(r"[.;:\s]+$", "", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def _flexify_fixed_literal(escaped: str) -> str:
-    escaped = escaped.replace(r"\ ", r"\s+")
-    escaped = escaped.replace(r"\,", r"[\s,]*")
-    escaped = escaped.replace(r"\-", r"[\-\–\—]\s*")
-    escaped = escaped.replace(r"\.", r"[\.\s]*")
-    return escaped
-
-def template_to_regex_flex(template: str) -> re.Pattern:
-    if pd.isna(template):
-        template = ""
-    t = re.sub(r"\s+", " ", str(template)).strip()
-    parts = re.split(r"0+", t)
-    fixed = [_flexify_fixed_literal(re.escape(p)) for p in parts]
-    between = r"[\s\.,;:\-\–\—]*" + r"(.+?)" + r"[\s\.,;:\-\–\—]*"
-    body = between.join(fixed)
-    pattern = r"^\s*" + body + r"\s*[.,;:\-–—]*\s*$"
-    try:
-        return re.compile(pattern, flags=re.IGNORECASE | re.DOTALL)
-    except re.error:
-        return re.compile(r"^\s*" + re.escape(t) + r"\s*$", flags=re.IGNORECASE)
-
-# Mapa pré-compilado das regras
-RULES_MAP = {}
-for r in REGRAS_EMBUTIDAS:
-    key = (canon(r["causa"]), canon(r["motivo"]))
-    RULES_MAP[key] = (r["motivo"], template_to_regex_flex(r["mascara_modelo"]), r["mascara_modelo"])
-
-def detect_motivo_and_mask(full_text: str):
-    if not full_text:
-        return "", "", ""
-    txt = re.sub(r"\s+", " ", str(full_text)).strip()
-    txt_c = canon(txt)
-    causa_padrao = "Agendamento cancelado."
-    causa_padrao_c = canon(causa_padrao)
-
-    for (c_norm, m_norm), (motivo_original, _regex, _modelo) in RULES_MAP.items():
-        if c_norm != causa_padrao_c:
-            continue
-        if m_norm in txt_c:
-            idx = txt_c.find(m_norm) + len(m_norm)
-            mascara = txt[idx:].strip(" .")
-            return causa_padrao, motivo_original, mascara
-    return "", "", txt
-
-def read_any(f):
-    if f is None:
-        return None
-    name = f.name.lower()
-    if name.endswith(".csv"):
-        try:
-            return pd.read_csv(f, sep=None, engine="python")
-        except Exception:
-            f.seek(0); return pd.read_csv(f)
-    try:
-        return pd.read_excel(f, engine="openpyxl")
-    except Exception:
-        f.seek(0); return pd.read_excel(f)
+# Regras ativas nesta sessão (embutidas + runtime)
+if "regras_ativas" not in st.session_state:
+    st.session_state["regras_ativas"] = list(REGRAS_EMBUTIDAS)
+    st.session_state["rules_map"] = build_rules_map(REGRAS_EMBUTIDAS)
+    st.session_state["regras_versao"] = 0
+RULES_MAP = st.session_state["rules_map"]
 
 # ------------------------------------------------------------
-# Gatilhos da REGRA ESPECIAL → viram "No-show Cliente"
+# CACHE POR SESSÃO + PRÉ-VISUALIZAÇÃO PAGINADA
 # ------------------------------------------------------------
-ESPECIAIS_NO_SHOW_CLIENTE = [
-    "Automático - PORTAL",
-    "Michelin",
-    "OUTRO",
-]
+def cache_sessao(chave, assinatura, calcular):
+    # Recalcula só quando a assinatura muda; reruns do Streamlit reaproveitam o resultado
+    item = st.session_state.get(chave)
+    if item is None or item[0] != assinatura:
+        item = (assinatura, calcular())
+        st.session_state[chave] = item
+    return item[1]
+
+# Seleções (filtros + ordenação) com posições guardadas por preview
+PREVIEW_MAX_SELECOES = 3
+# Colunas exibidas por matriz de concordância (as demais só no Excel)
+MAX_COLUNAS_MATRIZ = 30
+
+def preview_paginado(df, key, versao, colunas=None, colunas_filtro=(), tamanho_padrao=50):
+    """Envia ao navegador só uma página de `df`.
+
+    Filtros e ordenação rodam no servidor; contagens por valor ficam em cache
+    até `versao` mudar, e as posições filtradas só das últimas seleções.
+    """
+    colunas = list(colunas) if colunas is not None else list(df.columns)
+    colunas_filtro = [c for c in dict.fromkeys(colunas_filtro) if c in df.columns]
+    cache = st.session_state.get(f"{key}__preview")
+    if cache is None or cache["versao"] != versao:
+        cache = {"versao": versao, "contagens": contar_valores(df, colunas_filtro), "posicoes": {}}
+        st.session_state[f"{key}__preview"] = cache
+
+    filtros = {}
+    if colunas_filtro:
+        fcols = st.columns(len(colunas_filtro))
+        for fc, c in zip(fcols, colunas_filtro):
+            cont = cache["contagens"][c]
+            filtros[c] = fc.multiselect(
+                c, options=list(cont), key=f"{key}__f_{c}",
+                format_func=lambda v, cont=cont: f"{v or '(vazio)'} ({cont.get(v, 0)})"
+            )
 
-def eh_especial_no_show_cliente(valor: str) -> bool:
-    v = canon(valor)
-    return any(canon(g) in v for g in ESPECIAIS_NO_SHOW_CLIENTE if g.strip())
+    c_ord, c_dir, c_tam = st.columns([3, 1, 1])
+    ordenar_por = c_ord.selectbox("Ordenar por", ["(sem ordenação)"] + colunas, key=f"{key}__ord")
+    crescente = c_dir.radio("Ordem", ["↑", "↓"], horizontal=True, key=f"{key}__dir") == "↑"
+    tamanho = c_tam.selectbox("Linhas/página", [25, 50, 100, 200, 500],
+                              index=[25, 50, 100, 200, 500].index(tamanho_padrao), key=f"{key}__tam")
+    ordenar_por = None if ordenar_por == "(sem ordenação)" else ordenar_por
+
+    sel = (tuple((c, tuple(v)) for c, v in filtros.items()), ordenar_por, crescente)
+    posicoes = cache["posicoes"]
+    pos = posicoes.pop(sel, None)
+    if pos is None:
+        pos = posicoes_filtradas(df, filtros, ordenar_por, crescente)
+    posicoes[sel] = pos  # mais recente no fim
+    while len(posicoes) > PREVIEW_MAX_SELECOES:
+        posicoes.pop(next(iter(posicoes)))
+
+    n_paginas = max(1, -(-len(pos) // tamanho))
+    n_pagina = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas,
+                               value=1, step=1, key=f"{key}__pag_{hash(sel)}_{tamanho}")
+    ini = (int(n_pagina) - 1) * tamanho
+    st.dataframe(pagina(df, pos, int(n_pagina), tamanho)[colunas], use_container_width=True)
+    st.caption(f"Linhas {min(ini + 1, len(pos))}–{min(ini + tamanho, len(pos))} de {len(pos)} "
+               f"(filtradas de {len(df)})")
 
 # ============================================================
 # (Opcional) Adicionar regras rápidas (runtime)
@@ -253,16 +136,10 @@ with st.expander("Adicionar novas regras **sem editar** o código"):
                 st.warning(e)
 
         if extras:
-            base_by_key = {(canon(r["causa"]), canon(r["motivo"])): r for r in REGRAS_EMBUTIDAS}
-            for r in extras:
-                key = (canon(r["causa"]), canon(r["motivo"]))
-                base_by_key[key] = r
-            REGRAS_EMBUTIDAS[:] = list(base_by_key.values())
-
-            RULES_MAP.clear()
-            for r in REGRAS_EMBUTIDAS:
-                key = (canon(r["causa"]), canon(r["motivo"]))
-                RULES_MAP[key] = (r["motivo"], template_to_regex_flex(r["mascara_modelo"]), r["mascara_modelo"])
+            regras = mesclar_regras(st.session_state["regras_ativas"], extras)
+            st.session_state["regras_ativas"] = regras
+            st.session_state["rules_map"] = RULES_MAP = build_rules_map(regras)
+            st.session_state["regras_versao"] += 1
 
             st.session_state["ultimas_regras_aplicadas"] = extras
             st.success(f"✅ {len(extras)} regra(s) adicionada(s)/atualizada(s). Já estão ativas nesta sessão.")
@@ -274,15 +151,12 @@ if "ultimas_regras_aplicadas" in st.session_state and st.session_state["ultimas_
 # ============================================================
 # Exportar regras (JSON)
 # ============================================================
-import json
-from datetime import datetime
-
 st.markdown("#### Exportar regras (JSON)")
 
 def _sort_key(r):
     return (str(r.get("causa", "")).lower(), str(r.get("motivo", "")).lower())
 
-regras_atuais = sorted(REGRAS_EMBUTIDAS, key=_sort_key)
+regras_atuais = sorted(st.session_state["regras_ativas"], key=_sort_key)
 json_str = json.dumps(regras_atuais, ensure_ascii=False, indent=2)
 fname = f"regras_no_show_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
@@ -309,91 +183,37 @@ Selecione **uma coluna** com o texto completo no formato:
 E (opcional) selecione uma **coluna especial**: se o valor bater em **qualquer gatilho** (ex.: `Automático - PORTAL`, `Michelin`, `OUTRO`), a linha será classificada como **No-show Cliente**.
 """)
 
-# Helper p/ 4 categorias
-def categoria_por_motivo(motivo: str) -> str:
-    m = canon(motivo)
-    if not m:
-        return ""
-    if m.startswith("erro de agendamento") or "erro de roteirizacao do agendamento" in m:
-        return "Erro Agendamento"
-    if m.startswith("falta de equipamento") or "perda/extravio" in m or "equipamento com defeito" in m:
-        return "Falta de equipamentos"
-    return ""
-
 file = st.file_uploader("Exportação (xlsx/csv) — coluna única + (opcional) coluna especial", type=["xlsx","csv"])
 
 if file:
-    df = read_any(file)
+    df = cache_sessao("m1_df", file.file_id, lambda: read_any(file))
     col_main = st.selectbox("Coluna principal (Causa. Motivo. Máscara...)", df.columns)
     col_especial = st.selectbox(
         "Coluna especial (opcional) — gatilhos forçam No-show Cliente",
         ["(Nenhuma)"] + list(df.columns)
     )
+    validar_campos = st.checkbox(
+        "Validar campos de Data/Hora extraídos da máscara",
+        value=False,
+        help="Campos nomeados 'Data' ou 'Hora' nas regras são conferidos no mesmo passo do casamento; valores inválidos viram No-show Técnico. "
+             "Todas as regras embutidas nomeiam seus campos; regras rápidas (runtime) não têm nomes e não são conferidas."
+    )
 
-    resultados, detalhes = [], []
-    causas, motivos, mascaras_preenchidas = [], [], []
-    combos, mascaras_modelo = [], []
-
-    for _, row in df.iterrows():
-        causa, motivo, mascara = detect_motivo_and_mask(row.get(col_main, ""))
-        causas.append(causa)
-        motivos.append(motivo)
-        mascaras_preenchidas.append(mascara)
-        partes = [p for p in [str(causa).strip(), str(motivo).strip(), str(mascara).strip()] if p]
-        combos.append(" ".join(partes))
-
-        mascara_modelo_val = ""
-
-        if col_especial != "(Nenhuma)":
-            valor_especial = row.get(col_especial, "")
-            if eh_especial_no_show_cliente(valor_especial):
-                resultados.append("No-show Cliente")
-                detalhes.append(
-                    f"Regra especial aplicada: coluna especial = '{valor_especial}'. "
-                    f"Gatilhos ativos: {', '.join(ESPECIAIS_NO_SHOW_CLIENTE)}"
-                )
-                mascaras_modelo.append(mascara_modelo_val)
-                continue
-
-        key = (canon(causa), canon(motivo))
-        found = RULES_MAP.get(key)
-        if not found:
-            resultados.append("No-show Técnico")
-            detalhes.append("Motivo não reconhecido nas regras embutidas.")
-            mascaras_modelo.append(mascara_modelo_val)
-            continue
-
-        _motivo_oficial, regex, modelo = found
-        mascara_modelo_val = modelo or ""
-        mascara_norm = re.sub(r"\s+", " ", str(mascara)).strip()
-        if regex.fullmatch(mascara_norm):
-            resultados.append("Máscara correta")
-            detalhes.append("")
-        else:
-            resultados.append("No-show Técnico")
-            detalhes.append("Não casa com o modelo (mesmo no modo tolerante).")
-        mascaras_modelo.append(mascara_modelo_val)
-
-    out = df.copy()
-    out["Causa detectada"] = causas
-    out["Motivo detectado"] = motivos
-    out["Máscara prestador (preenchida)"] = mascaras_preenchidas
-    out["Máscara prestador"] = mascaras_modelo
-    out["Causa. Motivo. Máscara (extra)"] = combos
-    out["Classificação No-show"] = resultados
-    out["Detalhe"] = detalhes
-
-    # Resultado No Show (4 categorias)
-    resultado_no_show = []
-    for r_cls, mot in zip(resultados, motivos):
-        cat = categoria_por_motivo(mot)
-        if cat:
-            resultado_no_show.append(cat)
-        elif r_cls in ("Máscara correta", "No-show Cliente"):
-            resultado_no_show.append("No-show Cliente")
-        else:
-            resultado_no_show.append("No-show Técnico")
-    out["Resultado No Show"] = resultado_no_show
+    assinatura_m1 = (file.file_id, col_main, col_especial, validar_campos, st.session_state["regras_versao"])
+    resultado_m1, cols_campos, cols_sobrescritas = cache_sessao(
+        "m1_resultado", assinatura_m1,
+        lambda: validar_dataframe(
+            df, col_main,
+            None if col_especial == "(Nenhuma)" else col_especial,
+            RULES_MAP, validar_campos,
+        )
+    )
+    out = resultado_m1.copy(deep=False)
+    if cols_sobrescritas:
+        st.warning(
+            "Colunas do arquivo substituídas pelos campos extraídos nesta validação: "
+            + ", ".join(cols_sobrescritas)
+        )
 
     # Alocação de atendentes
     st.markdown("### Alocação de atendentes (opcional)")
@@ -440,10 +260,10 @@ if file:
         "Classificação No-show",
         "Detalhe",
         "Resultado No Show",
-    ]
+    ] + cols_campos
     originais = [c for c in df.columns if c in out.columns]
     geradas   = [c for c in geradas_order if c in out.columns]
-    todas_cols_pre = originais + geradas
+    todas_cols_pre = list(dict.fromkeys(originais + geradas))
 
     if export_all_pre:
         cols_export_pre = todas_cols_pre
@@ -458,14 +278,25 @@ if file:
             cols_export_pre = todas_cols_pre
 
     st.success("Validação concluída.")
-    st.dataframe(out[cols_export_pre], use_container_width=True)
+    preview_paginado(
+        out, "m1", (assinatura_m1, tuple(nomes_list)),
+        colunas=cols_export_pre,
+        colunas_filtro=["Classificação No-show", "Resultado No Show", "Motivo detectado", "Atendente designado"],
+    )
 
-    buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as w:
-        out[cols_export_pre].to_excel(w, index=False, sheet_name="Resultado")
+    def _excel_pre():
+        buf = io.BytesIO()
+        with pd.ExcelWriter(buf, engine="openpyxl") as w:
+            out[cols_export_pre].to_excel(w, index=False, sheet_name="Resultado")
+        return buf.getvalue()
+
+    # Workbook só é reescrito quando resultado, atendentes ou colunas mudam
+    excel_pre = cache_sessao(
+        "m1_excel", (assinatura_m1, tuple(nomes_list), tuple(cols_export_pre)), _excel_pre
+    )
     st.download_button(
         "Baixar Excel — Pré-análise (com seleção de colunas)",
-        data=buf.getvalue(),
+        data=excel_pre,
         file_name="resultado_no_show.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
@@ -480,6 +311,7 @@ st.markdown("---")
 st.header("Módulo 2 — Conferência (Dupla checagem) — múltiplas comparações")
 st.markdown("""
 Envie o **relatório conferido pelo atendente** (xlsx/csv).  
+(Opcional) Envie também o **resultado do robô** (`resultado_no_show.xlsx` do Módulo 1): as linhas são juntadas por uma **chave** (ex.: `O.S.`), sem mesclar planilhas no Excel.  
 Mapeie **duplas de comparação** (coluna do **Robô** × coluna do **Atendente**).
 
 **Status Geral da linha**
@@ -488,46 +320,47 @@ Mapeie **duplas de comparação** (coluna do **Robô** × coluna do **Atendente*
 - **Divergência**: pelo menos uma dupla diverge
 """)
 
-def read_any_loose(f):
-    if f is None:
-        return None
-    name = f.name.lower()
-    if name.endswith(".csv"):
-        try:
-            return pd.read_csv(f, sep=None, engine="python", skip_blank_lines=True)
-        except Exception:
-            f.seek(0); return pd.read_csv(f)
-    try:
-        df = pd.read_excel(f, engine="openpyxl")
-        if str(df.columns[0]).lower().startswith("unnamed"):
-            f.seek(0)
-            df = pd.read_excel(f, engine="openpyxl", skiprows=1)
-        return df
-    except Exception:
-        f.seek(0); return pd.read_excel(f)
-
-# normalizador (cobre 4 categorias)
-def normalize_outcome(x: str) -> str:
-    c = canon(x)
-    if "erro agendamento" in c or ("erro" in c and "agendamento" in c):
-        return "erro agendamento"
-    if "falta de equipamento" in c or "perda/extravio" in c or "equipamento com defeito" in c:
-        return "falta de equipamentos"
-    if "cliente" in c:
-        return "no-show cliente"
-    if "tecnico" in c or "técnico" in c:
-        return "no-show tecnico"
-    if "mascara correta" in c or "máscara correta" in c:
-        return "no-show cliente"
-    return c
-
 conf_file = st.file_uploader("Relatório conferido (xlsx/csv)", type=["xlsx", "csv"], key="conf-multi")
+robo_file = st.file_uploader("Resultado do robô — Módulo 1 (opcional, xlsx/csv)", type=["xlsx", "csv"], key="conf-robo")
+
+def _idx_chave(colunas, preferida="O.S."):
+    return colunas.index(preferida) if preferida in colunas else 0
 
 if "pairs_n" not in st.session_state:
     st.session_state.pairs_n = 3
 
 if conf_file:
-    dfr = read_any_loose(conf_file)
+    dfr = cache_sessao("m2_dfr", conf_file.file_id, lambda: read_any_loose(conf_file))
+    fonte_m2 = conf_file.file_id
+
+    if robo_file:
+        df_robo = cache_sessao("m2_robo", robo_file.file_id, lambda: read_any(robo_file))
+        st.subheader("Junção por chave (Robô × Atendente)")
+        cols_att, cols_robo = list(dfr.columns), list(df_robo.columns)
+        k1, k2 = st.columns(2)
+        chave_robo = k1.selectbox("Chave no resultado do robô", cols_robo, index=_idx_chave(cols_robo), key="chave_robo")
+        chave_att  = k2.selectbox("Chave no relatório do atendente", cols_att, index=_idx_chave(cols_att), key="chave_att")
+
+        fonte_m2 = (conf_file.file_id, robo_file.file_id, chave_robo, chave_att)
+        dfr, rel = cache_sessao(
+            "m2_juncao", fonte_m2,
+            lambda: juntar_por_chave(df_robo, dfr, chave_robo, chave_att)
+        )
+
+        j1, j2, j3, j4, j5 = st.columns(5)
+        j1.metric("Pares juntados", rel["pares"])
+        j2.metric("Sem par — Robô", len(rel["sem_par_robo"]))
+        j3.metric("Sem par — Atendente", len(rel["sem_par_atendente"]))
+        j4.metric("Chaves duplicadas — Robô", len(rel["duplicadas_robo"]))
+        j5.metric("Chaves duplicadas — Atendente", len(rel["duplicadas_atendente"]))
+        if rel["vazias_robo"] or rel["vazias_atendente"]:
+            st.warning(f"Linhas com chave vazia ignoradas — Robô: {rel['vazias_robo']} | Atendente: {rel['vazias_atendente']}")
+        if rel["duplicadas_robo"] or rel["duplicadas_atendente"]:
+            st.caption("Chaves duplicadas: a conferência usa a **1ª ocorrência** de cada lado.")
+
+        with st.expander("Chaves sem par / duplicadas"):
+            preview_paginado(rel["tabela_chaves"], "m2_chaves", fonte_m2, colunas_filtro=["Ocorrência"], tamanho_padrao=25)
+
     cols = list(dfr.columns)
 
     st.subheader("Duplas de comparação (Robô × Atendente)")
@@ -544,7 +377,7 @@ if conf_file:
         att_col  = c2.selectbox(f"Atendente — coluna #{i+1}", cols, key=f"att_col_{i}")
         pair_defs.append((robo_col, att_col))
 
-    pair_labels = [f"{rc} × {ac}" for rc, ac in pair_defs]
+    pair_labels = [rotulo_dupla(rc, ac) for rc, ac in pair_defs]
 
     def safe_sheet_name(name: str) -> str:
         bad = r']:*?/\\['
@@ -553,45 +386,10 @@ if conf_file:
         name = name.strip()
         return name[:31] if len(name) > 31 else name
 
-    linhas_status_geral = []
-    pair_status_cols = {i: [] for i in range(st.session_state.pairs_n)}
-    pair_robo_norm_cols = {i: [] for i in range(st.session_state.pairs_n)}
-    pair_att_norm_cols  = {i: [] for i in range(st.session_state.pairs_n)}
-
-    for _, r in dfr.iterrows():
-        tem_pendencia = False
-        tem_div = False
-        for i, (rc, ac) in enumerate(pair_defs):
-            robo_val = r.get(rc, "")
-            att_val  = r.get(ac, "")
-
-            rn = normalize_outcome(robo_val)
-            an = normalize_outcome(att_val)
-
-            pair_robo_norm_cols[i].append(rn)
-            pair_att_norm_cols[i].append(an)
-
-            if not str(att_val).strip():
-                pair_status_cols[i].append("Pendência (vazio)")
-                tem_pendencia = True
-            else:
-                if rn == an:
-                    pair_status_cols[i].append("OK")
-                else:
-                    pair_status_cols[i].append("Divergência")
-                    tem_div = True
-
-        if tem_pendencia:
-            linhas_status_geral.append("Pendência (vazio)")
-        else:
-            linhas_status_geral.append("Divergência" if tem_div else "OK")
-
-    dfo = dfr.copy()
-    for i in range(st.session_state.pairs_n):
-        dfo[f"{pair_labels[i]} — Robô (norm)"] = pair_robo_norm_cols[i]
-        dfo[f"{pair_labels[i]} — Atendente (norm)"] = pair_att_norm_cols[i]
-        dfo[f"{pair_labels[i]} — Status"] = pair_status_cols[i]
-    dfo["Conferência — Status geral"] = linhas_status_geral
+    versao_m2 = (fonte_m2, tuple(pair_defs))
+    dfo, pair_status_cols, pair_robo_norm_cols, pair_att_norm_cols = cache_sessao(
+        "m2_resultado", versao_m2, lambda: conferir_duplas(dfr, pair_defs)
+    )
 
     total = len(dfo)
     ok   = int((dfo["Conferência — Status geral"] == "OK").sum())
@@ -625,6 +423,12 @@ if conf_file:
 """
     )
 
+    st.subheader("Conferência (pré-visualização)")
+    preview_paginado(
+        dfo, "m2_conf", versao_m2,
+        colunas_filtro=["Conferência — Status geral"] + [f"{l} — Status" for l in pair_labels],
+    )
+
     st.subheader("Indicadores por dupla de comparação")
     st.caption("Cada dupla é nomeada como **Robô × Atendente** usando os nomes de coluna selecionados.")
 
@@ -660,17 +464,37 @@ if conf_file:
 """)
 
     st.subheader("Matrizes de concordância (por dupla)")
-    matrizes = {}
+    def _matrizes():
+        # {i: (matriz completa p/ Excel, matriz exibida com no máx. MAX_COLUNAS_MATRIZ colunas)}
+        mats = {}
+        for i in range(st.session_state.pairs_n):
+            try:
+                cm = pd.crosstab(
+                    pd.Series(pair_robo_norm_cols[i], name="Robô (norm)"),
+                    pd.Series(pair_att_norm_cols[i],  name="Atendente (norm)")
+                )
+            except Exception:
+                continue
+            if cm.shape[1] > MAX_COLUNAS_MATRIZ:
+                top = cm.sum(axis=0).sort_values(ascending=False, kind="mergesort").index[:MAX_COLUNAS_MATRIZ]
+                mats[i] = (cm, cm[top])
+            else:
+                mats[i] = (cm, cm)
+        return mats
+
+    matrizes_cache = cache_sessao("m2_matrizes", versao_m2, _matrizes)
+    matrizes = {i: cm for i, (cm, _vis) in matrizes_cache.items()}
     for i in range(st.session_state.pairs_n):
-        try:
-            cm = pd.crosstab(
-                pd.Series(pair_robo_norm_cols[i], name="Robô (norm)"),
-                pd.Series(pair_att_norm_cols[i],  name="Atendente (norm)")
-            )
-            matrizes[i] = cm
+        if i in matrizes_cache:
+            cm, cm_vis = matrizes_cache[i]
             st.markdown(f"**{pair_labels[i]}**")
-            st.dataframe(cm, use_container_width=True)
-        except Exception:
+            if cm_vis.shape[1] < cm.shape[1]:
+                st.caption(
+                    f"Matriz com {cm.shape[1]} colunas — exibindo as {cm_vis.shape[1]} mais frequentes. "
+                    "A matriz completa vai para o Excel (aba Matriz_<Dupla>). Confira se a dupla mapeada está correta."
+                )
+            preview_paginado(cm_vis, f"m2_cm_{i}", versao_m2, tamanho_padrao=25)
+        else:
             st.info(f"Não foi possível montar a matriz para a dupla **{pair_labels[i]}**.")
 
     st.markdown("### Exportação — seleção de conteúdo")
@@ -697,33 +521,41 @@ if conf_file:
             st.warning("Sem colunas selecionadas para a aba Conferencia — exportarei todas.")
             cols_export_conf = list(dfo.columns)
 
-    outbuf = io.BytesIO()
-    with pd.ExcelWriter(outbuf, engine="openpyxl") as w:
-        if exp_conf:
-            dfo[cols_export_conf].to_excel(w, index=False, sheet_name="Conferencia")
-        if exp_kpis:
-            indicadores = pd.DataFrame([
-                {"Métrica": "Total", "Valor": total},
-                {"Métrica": "OK", "Valor": ok},
-                {"Métrica": "Divergência", "Valor": div},
-                {"Métrica": "Pendência", "Valor": pend},
-                {"Métrica": "% Desvios RT", "Valor": round(desvio_rt, 1)},
-                {"Métrica": "% Desvios atendente", "Valor": round(desvio_att, 1)},
-                {"Métrica": "% RPA", "Valor": round(perc_rpa, 1)},
-                {"Métrica": "% Atendimento Humano", "Valor": round(perc_humano, 1)},
-                {"Métrica": "Acurácia (%)", "Valor": round(acc, 1)},
-            ])
-            indicadores.to_excel(w, index=False, sheet_name="Indicadores")
-        if exp_duplas:
-            df_ind_duplas.to_excel(w, index=False, sheet_name="Indicadores_por_dupla")
-        if exp_mats and matrizes:
-            for i, cm in matrizes.items():
-                sheet = safe_sheet_name(f"Matriz_{pair_labels[i]}")
-                cm.to_excel(w, sheet_name=sheet)
-
+    def _excel_conf():
+        outbuf = io.BytesIO()
+        with pd.ExcelWriter(outbuf, engine="openpyxl") as w:
+            if exp_conf:
+                dfo[cols_export_conf].to_excel(w, index=False, sheet_name="Conferencia")
+            if exp_kpis:
+                indicadores = pd.DataFrame([
+                    {"Métrica": "Total", "Valor": total},
+                    {"Métrica": "OK", "Valor": ok},
+                    {"Métrica": "Divergência", "Valor": div},
+                    {"Métrica": "Pendência", "Valor": pend},
+                    {"Métrica": "% Desvios RT", "Valor": round(desvio_rt, 1)},
+                    {"Métrica": "% Desvios atendente", "Valor": round(desvio_att, 1)},
+                    {"Métrica": "% RPA", "Valor": round(perc_rpa, 1)},
+                    {"Métrica": "% Atendimento Humano", "Valor": round(perc_humano, 1)},
+                    {"Métrica": "Acurácia (%)", "Valor": round(acc, 1)},
+                ])
+                indicadores.to_excel(w, index=False, sheet_name="Indicadores")
+            if exp_duplas:
+                df_ind_duplas.to_excel(w, index=False, sheet_name="Indicadores_por_dupla")
+            if exp_mats and matrizes:
+                for i, cm in matrizes.items():
+                    sheet = safe_sheet_name(f"Matriz_{pair_labels[i]}")
+                    cm.to_excel(w, sheet_name=sheet)
+        return outbuf.getvalue()
+
+    # Workbook só é reescrito quando a conferência ou a seleção de abas/colunas mudam
+    excel_conf = cache_sessao(
+        "m2_excel",
+        (versao_m2, exp_conf, exp_kpis, exp_duplas, exp_mats, tuple(cols_export_conf)),
+        _excel_conf,
+    )
     st.download_button(
         "Baixar Excel da conferência (seleção aplicada)",
-        data=outbuf.getvalue(),
+        data=excel_conf,
         file_name="conferencia_no_show.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
@@ -0,0 +1,29 @@
+"""Motor de regras do Validador de No-show (sem Streamlit).
+
+Importar o pacote não carrega pandas/openpyxl nem compila regex:
+as máscaras são compiladas na primeira busca de cada regra.
+"""
+from .conferencia import conferir_duplas, juntar_por_chave, normalizar_chave, rotulo_dupla
+from .leitura import read_any, read_any_loose
+from .mascaras import (
+    build_rules_map,
+    campos_invalidos,
+    coluna_campo,
+    detect_motivo_and_mask,
+    get_rules_map,
+    lookup_rule,
+    nomes_campos,
+    template_to_regex_flex,
+    valida_data,
+    valida_hora,
+)
+from .preview import contar_valores, pagina, posicoes_filtradas
+from .normalizacao import canon, categoria_por_motivo, is_missing, normalize_outcome, rm_acc
+from .regras import (
+    CAUSA_PADRAO,
+    ESPECIAIS_NO_SHOW_CLIENTE,
+    REGRAS_EMBUTIDAS,
+    eh_especial_no_show_cliente,
+    mesclar_regras,
+)
+from .validacao import resultado_no_show, validar_dataframe, validar_linha
@@ -0,0 +1,151 @@
+# ------------------------------------------------------------
+# MÓDULO 2 — CONFERÊNCIA (multi-duplas Robô × Atendente)
+# ------------------------------------------------------------
+from .normalizacao import is_missing, normalize_outcome
+
+def rotulo_dupla(robo_col, att_col) -> str:
+    return f"{robo_col} × {att_col}"
+
+def conferir_duplas(dfr, pair_defs: list):
+    """Status por dupla e status geral de cada linha.
+
+    Devolve (dfo, status, robo_norm, att_norm); os três últimos são
+    {i: lista por linha} para cada dupla de `pair_defs`.
+    """
+    pair_labels = [rotulo_dupla(rc, ac) for rc, ac in pair_defs]
+    linhas_status_geral = []
+    pair_status_cols = {i: [] for i in range(len(pair_defs))}
+    pair_robo_norm_cols = {i: [] for i in range(len(pair_defs))}
+    pair_att_norm_cols  = {i: [] for i in range(len(pair_defs))}
+
+    for _, r in dfr.iterrows():
+        tem_pendencia = False
+        tem_div = False
+        for i, (rc, ac) in enumerate(pair_defs):
+            robo_val = r.get(rc, "")
+            att_val  = r.get(ac, "")
+
+            rn = normalize_outcome(robo_val)
+            an = normalize_outcome(att_val)
+
+            pair_robo_norm_cols[i].append(rn)
+            pair_att_norm_cols[i].append(an)
+
+            if not str(att_val).strip():
+                pair_status_cols[i].append("Pendência (vazio)")
+                tem_pendencia = True
+            else:
+                if rn == an:
+                    pair_status_cols[i].append("OK")
+                else:
+                    pair_status_cols[i].append("Divergência")
+                    tem_div = True
+
+        if tem_pendencia:
+            linhas_status_geral.append("Pendência (vazio)")
+        else:
+            linhas_status_geral.append("Divergência" if tem_div else "OK")
+
+    dfo = dfr.copy()
+    for i in range(len(pair_defs)):
+        dfo[f"{pair_labels[i]} — Robô (norm)"] = pair_robo_norm_cols[i]
+        dfo[f"{pair_labels[i]} — Atendente (norm)"] = pair_att_norm_cols[i]
+        dfo[f"{pair_labels[i]} — Status"] = pair_status_cols[i]
+    dfo["Conferência — Status geral"] = linhas_status_geral
+    return dfo, pair_status_cols, pair_robo_norm_cols, pair_att_norm_cols
+
+# ------------------------------------------------------------
+# Junção Robô × Atendente por chave (hash join, 1ª ocorrência)
+# ------------------------------------------------------------
+SUFIXO_ROBO = " (Robô)"
+
+def normalizar_chave(v) -> str:
+    # 123, 123.0 e " 123 " viram a mesma chave
+    if is_missing(v):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    s = str(v).strip()
+    if s.endswith(".0") and s[:-2].isdigit():
+        s = s[:-2]
+    return s
+
+def _nome_livre(nome: str, usados: set) -> str:
+    # "<col> (Robô)", depois "<col> (Robô) 2", "<col> (Robô) 3"... até não colidir
+    candidato, n = f"{nome}{SUFIXO_ROBO}", 2
+    while candidato in usados:
+        candidato, n = f"{nome}{SUFIXO_ROBO} {n}", n + 1
+    return candidato
+
+def _indexar(chaves: list):
+    primeira, duplicadas, vazias = {}, {}, 0
+    for pos, k in enumerate(chaves):
+        if not k:
+            vazias += 1
+        elif k in primeira:
+            duplicadas[k] = duplicadas.get(k, 1) + 1
+        else:
+            primeira[k] = pos
+    return primeira, duplicadas, vazias
+
+def juntar_por_chave(df_robo, df_att, chave_robo, chave_att):
+    """Junta o resultado do robô ao relatório do atendente pela chave.
+
+    Hash join interno na ordem do relatório do atendente; chaves repetidas
+    usam a 1ª ocorrência de cada lado e são reportadas. Colunas do robô com
+    nome já existente no relatório recebem o sufixo " (Robô)" (numerado se
+    esse nome também já existir).
+    Devolve (df_juntado, relatorio); relatorio["tabela_chaves"] lista as
+    chaves sem par e duplicadas de cada lado.
+    """
+    import pandas as pd
+    idx_robo, dup_robo, vazias_robo = _indexar([normalizar_chave(v) for v in df_robo[chave_robo]])
+    idx_att, dup_att, vazias_att = _indexar([normalizar_chave(v) for v in df_att[chave_att]])
+
+    pos_att, pos_robo = [], []
+    for k, pa in idx_att.items():
+        pr = idx_robo.get(k)
+        if pr is not None:
+            pos_att.append(pa)
+            pos_robo.append(pr)
+
+    esquerda = df_att.iloc[pos_att].reset_index(drop=True)
+    direita = df_robo.iloc[pos_robo].reset_index(drop=True).drop(columns=[chave_robo])
+    usados = set(esquerda.columns) | set(direita.columns)
+    nomes = []
+    for c in direita.columns:
+        if c in esquerda.columns:
+            c = _nome_livre(c, usados)
+            usados.add(c)
+        nomes.append(c)
+    direita.columns = nomes
+    juntado = pd.concat([esquerda, direita], axis=1)
+
+    sem_par_robo = [k for k in idx_robo if k not in idx_att]
+    sem_par_att = [k for k in idx_att if k not in idx_robo]
+    relatorio = {
+        "pares": len(pos_att),
+        "sem_par_robo": sem_par_robo,
+        "sem_par_atendente": sem_par_att,
+        "duplicadas_robo": dup_robo,
+        "duplicadas_atendente": dup_att,
+        "vazias_robo": vazias_robo,
+        "vazias_atendente": vazias_att,
+        "tabela_chaves": _tabela_chaves(sem_par_robo, sem_par_att, dup_robo, dup_att),
+    }
+    return juntado, relatorio
+
+def _tabela_chaves(sem_par_robo, sem_par_att, dup_robo, dup_att):
+    # Montada uma vez, coluna a coluna (sem um dict por chave)
+    import pandas as pd
+    grupos = [
+        ("Sem par — Robô", sem_par_robo, [1] * len(sem_par_robo)),
+        ("Sem par — Atendente", sem_par_att, [1] * len(sem_par_att)),
+        ("Duplicada — Robô", list(dup_robo), list(dup_robo.values())),
+        ("Duplicada — Atendente", list(dup_att), list(dup_att.values())),
+    ]
+    return pd.DataFrame({
+        "Chave": [k for _, ks, _ in grupos for k in ks],
+        "Ocorrência": [rot for rot, ks, _ in grupos for _ in range(len(ks))],
+        "Linhas": [n for _, _, ns in grupos for n in ns],
+    })
@@ -0,0 +1,37 @@
+# ------------------------------------------------------------
+# LEITURA DE ARQUIVOS (pandas/openpyxl importados só aqui dentro)
+# ------------------------------------------------------------
+
+def read_any(f):
+    if f is None:
+        return None
+    import pandas as pd
+    name = f.name.lower()
+    if name.endswith(".csv"):
+        try:
+            return pd.read_csv(f, sep=None, engine="python")
+        except Exception:
+            f.seek(0); return pd.read_csv(f)
+    try:
+        return pd.read_excel(f, engine="openpyxl")
+    except Exception:
+        f.seek(0); return pd.read_excel(f)
+
+def read_any_loose(f):
+    if f is None:
+        return None
+    import pandas as pd
+    name = f.name.lower()
+    if name.endswith(".csv"):
+        try:
+            return pd.read_csv(f, sep=None, engine="python", skip_blank_lines=True)
+        except Exception:
+            f.seek(0); return pd.read_csv(f)
+    try:
+        df = pd.read_excel(f, engine="openpyxl")
+        if str(df.columns[0]).lower().startswith("unnamed"):
+            f.seek(0)
+            df = pd.read_excel(f, engine="openpyxl", skiprows=1)
+        return df
+    except Exception:
+        f.seek(0); return pd.read_excel(f)
@@ -0,0 +1,134 @@
+# ------------------------------------------------------------
+# MÁSCARAS (regex tolerante, compilada sob demanda)
+# ------------------------------------------------------------
+import calendar
+import re
+from functools import lru_cache
+
+from .normalizacao import canon, is_missing
+from .regras import CAUSA_PADRAO, REGRAS_EMBUTIDAS
+
+# Caches de regex são do processo (compartilhados entre sessões): limitados
+# para que regras runtime de todas as sessões não se acumulem para sempre.
+MAX_REGRAS_COMPILADAS = 256
+
+def _flexify_fixed_literal(escaped: str) -> str:
+    escaped = escaped.replace(r"\ ", r"\s+")
+    escaped = escaped.replace(r"\,", r"[\s,]*")
+    escaped = escaped.replace(r"\-", r"[\-\–\—]\s*")
+    escaped = escaped.replace(r"\.", r"[\.\s]*")
+    return escaped
+
+@lru_cache(maxsize=MAX_REGRAS_COMPILADAS)
+def template_to_regex_flex(template: str) -> re.Pattern:
+    if is_missing(template):
+        template = ""
+    t = re.sub(r"\s+", " ", str(template)).strip()
+    parts = re.split(r"0+", t)
+    fixed = [_flexify_fixed_literal(re.escape(p)) for p in parts]
+    between = r"[\s\.,;:\-\–\—]*" + r"(.+?)" + r"[\s\.,;:\-\–\—]*"
+    body = between.join(fixed)
+    pattern = r"^\s*" + body + r"\s*[.,;:\-–—]*\s*$"
+    try:
+        return re.compile(pattern, flags=re.IGNORECASE | re.DOTALL)
+    except re.error:
+        return re.compile(r"^\s*" + re.escape(t) + r"\s*$", flags=re.IGNORECASE)
+
+def nomes_campos(regra: dict, n: int) -> list:
+    # Nomes declarados em "campos"; placeholders sem nome viram "Campo i".
+    # Nomes repetidos são numerados ("Data", "Data 2", ...) para não perder valores.
+    declarados = [str(c).strip() for c in (regra.get("campos") or [])]
+    nomes, vistos = [], {}
+    for i in range(n):
+        nome = declarados[i] if i < len(declarados) and declarados[i] else f"Campo {i+1}"
+        vistos[nome] = vistos.get(nome, 0) + 1
+        nomes.append(nome if vistos[nome] == 1 else f"{nome} {vistos[nome]}")
+    return nomes
+
+def coluna_campo(nome: str) -> str:
+    return nome if re.fullmatch(r"Campo \d+", nome) else f"Campo — {nome}"
+
+# ------------------------------------------------------------
+# Mapa de regras: (causa, motivo) canônicos -> regra
+# A regex só é compilada na primeira busca da regra.
+# ------------------------------------------------------------
+def build_rules_map(regras: list) -> dict:
+    return {(canon(r["causa"]), canon(r["motivo"])): r for r in regras}
+
+_DEFAULT_RULES_MAP = None
+
+def get_rules_map() -> dict:
+    global _DEFAULT_RULES_MAP
+    if _DEFAULT_RULES_MAP is None:
+        _DEFAULT_RULES_MAP = build_rules_map(REGRAS_EMBUTIDAS)
+    return _DEFAULT_RULES_MAP
+
+@lru_cache(maxsize=MAX_REGRAS_COMPILADAS)
+def _compilar(motivo: str, modelo: str, campos: tuple) -> tuple:
+    regex = template_to_regex_flex(modelo)
+    return motivo, regex, modelo, nomes_campos({"campos": list(campos)}, regex.groups)
+
+def lookup_rule(key: tuple, rules_map: dict = None):
+    """(motivo oficial, regex, máscara modelo, nomes dos campos) ou None."""
+    rules_map = get_rules_map() if rules_map is None else rules_map
+    r = rules_map.get(key)
+    if r is None:
+        return None
+    return _compilar(r["motivo"], r["mascara_modelo"], tuple(r.get("campos") or ()))
+
+def detect_motivo_and_mask(full_text: str, rules_map: dict = None):
+    if not full_text:
+        return "", "", ""
+    rules_map = get_rules_map() if rules_map is None else rules_map
+    txt = re.sub(r"\s+", " ", str(full_text)).strip()
+    txt_c = canon(txt)
+    causa_padrao_c = canon(CAUSA_PADRAO)
+
+    for (c_norm, m_norm), regra in rules_map.items():
+        if c_norm != causa_padrao_c:
+            continue
+        if m_norm in txt_c:
+            idx = txt_c.find(m_norm) + len(m_norm)
+            mascara = txt[idx:].strip(" .")
+            return CAUSA_PADRAO, regra["motivo"], mascara
+    return "", "", txt
+
+# ------------------------------------------------------------
+# Validação tipada dos campos extraídos (Data / Hora)
+# ------------------------------------------------------------
+DATA_RE = re.compile(r"^(\d{1,2})[/\.\-](\d{1,2})(?:[/\.\-](\d{2}|\d{4}))?$")
+HORA_RE = re.compile(r"^(\d{1,2})\s*(?:[:h]\s*(\d{2})?)?\s*(?:min|hs?)?$", re.IGNORECASE)
+
+def valida_data(valor: str) -> bool:
+    m = DATA_RE.match(valor.strip())
+    if not m:
+        return False
+    dia, mes = int(m.group(1)), int(m.group(2))
+    if not 1 <= mes <= 12:
+        return False
+    # Sem ano, usa um ano bissexto para aceitar 29/02; ano com 2 dígitos = 20xx
+    ano = m.group(3)
+    ano = 2000 if ano is None else (2000 + int(ano) if len(ano) == 2 else int(ano))
+    return 1 <= dia <= calendar.monthrange(ano, mes)[1]
+
+def valida_hora(valor: str) -> bool:
+    m = HORA_RE.match(valor.strip())
+    if not m:
+        return False
+    return int(m.group(1)) <= 23 and int(m.group(2) or 0) <= 59
+
+# Tipo do campo pelo nome declarado na regra
+VALIDADORES_CAMPO = {
+    "data": valida_data,
+    "hora": valida_hora,
+}
+
+def _tipo_campo(nome: str) -> str:
+    # "Data 2" -> "data"
+    return re.sub(r"\s+\d+$", "", canon(nome))
+
+def campos_invalidos(campos: dict) -> list:
+    return [
+        nome for nome, valor in campos.items()
+        if _tipo_campo(nome) in VALIDADORES_CAMPO and not VALIDADORES_CAMPO[_tipo_campo(nome)](valor)
+    ]
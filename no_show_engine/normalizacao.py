@@ -0,0 +1,53 @@
+# ------------------------------------------------------------
+# NORMALIZAÇÃO (sem pandas: seguro para workers e scripts)
+# ------------------------------------------------------------
+import math
+import re
+import unicodedata
+
+def is_missing(x) -> bool:
+    # Equivalente a pd.isna para escalares, sem importar pandas
+    if x is None:
+        return True
+    if isinstance(x, float):
+        return math.isnan(x)
+    return type(x).__name__ in ("NAType", "NaTType")
+
+def rm_acc(s: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+def canon(s: str) -> str:
+    if is_missing(s):
+        return ""
+    s = str(s)
+    s = s.replace("–", "-").replace("—", "-")
+    s = rm_acc(s).lower()
+    s = re.sub(r"[.;:\s]+$", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+# Helper p/ 4 categorias
+def categoria_por_motivo(motivo: str) -> str:
+    m = canon(motivo)
+    if not m:
+        return ""
+    if m.startswith("erro de agendamento") or "erro de roteirizacao do agendamento" in m:
+        return "Erro Agendamento"
+    if m.startswith("falta de equipamento") or "perda/extravio" in m or "equipamento com defeito" in m:
+        return "Falta de equipamentos"
+    return ""
+
+# normalizador (cobre 4 categorias)
+def normalize_outcome(x: str) -> str:
+    c = canon(x)
+    if "erro agendamento" in c or ("erro" in c and "agendamento" in c):
+        return "erro agendamento"
+    if "falta de equipamento" in c or "perda/extravio" in c or "equipamento com defeito" in c:
+        return "falta de equipamentos"
+    if "cliente" in c:
+        return "no-show cliente"
+    if "tecnico" in c or "técnico" in c:
+        return "no-show tecnico"
+    if "mascara correta" in c or "máscara correta" in c:
+        return "no-show cliente"
+    return c
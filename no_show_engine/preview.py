@@ -0,0 +1,56 @@
+# ------------------------------------------------------------
+# PRÉ-VISUALIZAÇÃO (filtro/ordenação no servidor, uma página por vez)
+# ------------------------------------------------------------
+
+def _como_texto(serie):
+    return serie.fillna("").astype(str)
+
+def contar_valores(df, colunas) -> dict:
+    """{coluna: {valor: contagem}} em ordem decrescente de contagem."""
+    return {c: _como_texto(df[c]).value_counts().to_dict() for c in colunas if c in df.columns}
+
+def posicoes_filtradas(df, filtros: dict, ordenar_por=None, crescente: bool = True):
+    """Posições (iloc) das linhas que passam nos filtros, já ordenadas.
+
+    `filtros` é {coluna: [valores aceitos]}; lista vazia não filtra.
+    """
+    import numpy as np
+    mask = np.ones(len(df), dtype=bool)
+    for col, valores in filtros.items():
+        if valores:
+            mask &= _como_texto(df[col]).isin(list(valores)).to_numpy()
+    pos = np.flatnonzero(mask)
+
+    if ordenar_por:
+        chave = df[ordenar_por].iloc[pos].reset_index(drop=True)
+        try:
+            ordem = chave.sort_values(ascending=crescente, kind="mergesort", na_position="last").index
+        except TypeError:
+            ordem = _ordem_mista(chave, crescente)
+        pos = pos[ordem.to_numpy()]
+    return pos
+
+def _ordem_mista(chave, crescente: bool):
+    """Ordem para colunas com tipos misturados.
+
+    Números ordenam como números, depois os textos; vazios sempre no fim.
+    """
+    import pandas as pd
+    num = pd.to_numeric(chave, errors="coerce")
+    txt = _como_texto(chave)
+    faltante = chave.isna() | (txt.str.strip() == "")
+    aux = pd.DataFrame({
+        "faltante": faltante,
+        "texto": num.isna() & ~faltante,
+        "num": num,
+        "txt": txt.where(num.isna(), ""),
+    })
+    return aux.sort_values(
+        ["faltante", "texto", "num", "txt"],
+        ascending=[True, crescente, crescente, crescente],
+        kind="mergesort", na_position="last",
+    ).index
+
+def pagina(df, pos, n_pagina: int, tamanho: int):
+    ini = max(0, (n_pagina - 1) * tamanho)
+    return df.iloc[pos[ini:ini + tamanho]]
@@ -0,0 +1,163 @@
+# ============================================================
+# Regras embutidas (modelos oficiais de causa/motivo/máscara)
+# -> Base normalizada a partir das regras enviadas
+# ============================================================
+from .normalizacao import canon
+
+CAUSA_PADRAO = "Agendamento cancelado."
+
+REGRAS_EMBUTIDAS = [
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Alteração do tipo de serviço – De assistência para reinstalação",
+        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 foi informado sobre a necessidade de reagendamento.",
+        "campos": ["Motivo", "Cliente"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Atendimento Improdutivo – Ponto Fixo/Móvel",
+        "mascara_modelo": "Veículo compareceu para atendimento, porém por 0, não foi possível realizar o serviço.",
+        "campos": ["Motivo"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Cancelada a Pedido do Cliente",
+        "mascara_modelo": "Cliente 0 , contato via 0 em 0 - 0, informou indisponibilidade para o atendimento.",
+        "campos": ["Cliente", "Canal", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Cancelamento a pedido da RT",
+        "mascara_modelo": "Acordado novo agendamento com o cliente 0 no dia 0, via 0 - 0, pelo motivo - 0",
+        "campos": ["Cliente", "Data", "Canal", "Contato", "Motivo"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Cronograma de Instalação/Substituição de Placa",
+        "mascara_modelo": "Realizado atendimento com substituição de placa. Alteração feita pela OS 0.",
+        "campos": ["OS"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Erro De Agendamento - Cliente desconhecia o agendamento",
+        "mascara_modelo": "Em contato com o cliente o mesmo informou que desconhecia o agendamento. Nome cliente: 0 / Data contato: 0 - 0",
+        "campos": ["Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Erro de Agendamento – Endereço incorreto",
+        "mascara_modelo": "Erro identificado no agendamento: 0 . Situação: 0. Cliente 0 - informado em 0",
+        "campos": ["Erro", "Situação", "Cliente", "Data"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Erro de Agendamento – Falta de informações na O.S.",
+        "mascara_modelo": "OS agendada apresentou erro de 0 e foi identificado através de 0. Realizado o contato com o cliente 0 - no dia 0 - 0",
+        "campos": ["Erro", "Identificação", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Erro de Agendamento – O.S. agendada incorretamente (tipo/motivo/produto)",
+        "mascara_modelo": "OS agendada apresentou erro de 0 e foi identificado através de 0. Realizado o contato com o cliente 0 - no dia 0 - 0",
+        "campos": ["Erro", "Identificação", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Erro de roteirização do agendamento - Atendimento móvel",
+        "mascara_modelo": "Não foi possível concluir o atendimento devido 0 . Cliente às 0 - 0 foi informado sobre a necessidade de reagendamento. Especialista 0 informado às 0 - 0",
+        "campos": ["Motivo", "Data", "Hora", "Especialista", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Falta De Equipamento - Acessórios Imobilizado",
+        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0",
+        "campos": ["Item", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Falta De Equipamento - Item Reservado Não Compatível",
+        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0",
+        "campos": ["Item", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Falta De Equipamento - Material",
+        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0",
+        "campos": ["Item", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Falta De Equipamento - Principal",
+        "mascara_modelo": "Atendimento não realizado por falta de 0 . Cliente 0 informado em 0 - 0",
+        "campos": ["Item", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Instabilidade de Equipamento/Sistema",
+        "mascara_modelo": "Atendimento finalizado em 0 não concluído devido à instabilidade de 0. Registrado teste/reinstalação em 0 - 0. Realizado contato com a central 0 - 0 e foi gerada a ASM 0",
+        "campos": ["Data", "Sistema", "Data", "Hora", "Data", "Hora", "ASM"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "No-show Cliente – Ponto Fixo/Móvel",
+        "mascara_modelo": "Cliente não compareceu para atendimento até às 0.",
+        "campos": ["Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "No-show Técnico",
+        "mascara_modelo": "Técnico 0 , em 0 - 0, não realizou o atendimento por motivo de 0",
+        "campos": ["Técnico", "Data", "Hora", "Motivo"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Ocorrência com Técnico – Não foi possível realizar atendimento",
+        "mascara_modelo": "Técnico 0 , em 0 - 0, não realizou o atendimento por motivo de 0",
+        "campos": ["Técnico", "Data", "Hora", "Motivo"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Ocorrência Com Técnico - Sem Tempo Hábil Para Realizar O Serviço (Atendimento Parcial)",
+        "mascara_modelo": "Não foi possível concluir o atendimento devido 0 . Cliente 0 às 0 - 0 foi informado sobre a necessidade de reagendamento.",
+        "campos": ["Motivo", "Cliente", "Data", "Hora"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Ocorrência Com Técnico - Sem Tempo Hábil Para Realizar O Serviço (Não iniciado)",
+        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 - informado do reagendamento.",
+        "campos": ["Motivo", "Cliente"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Ocorrência Com Técnico - Técnico Sem Habilidade Para Realizar Serviço",
+        "mascara_modelo": "Não foi possível realizar o atendimento devido 0 . Cliente 0 foi informado sobre a necessidade de reagendamento.",
+        "campos": ["Motivo", "Cliente"]
+    },
+    {
+        "causa": "Agendamento cancelado.",
+        "motivo": "Perda/Extravio/Falta Do Equipamento/Equipamento Com Defeito",
+        "mascara_modelo": "Não foi possível realizar o atendimento pois 0. Cliente recusou assinar termo.",
+        "campos": ["Motivo"]
+    }
+]
+
+# ------------------------------------------------------------
+# Gatilhos da REGRA ESPECIAL → viram "No-show Cliente"
+# ------------------------------------------------------------
+ESPECIAIS_NO_SHOW_CLIENTE = [
+    "Automático - PORTAL",
+    "Michelin",
+    "OUTRO",
+]
+
+def eh_especial_no_show_cliente(valor: str, gatilhos=None) -> bool:
+    gatilhos = ESPECIAIS_NO_SHOW_CLIENTE if gatilhos is None else gatilhos
+    v = canon(valor)
+    return any(canon(g) in v for g in gatilhos if g.strip())
+
+def mesclar_regras(base: list, extras: list) -> list:
+    # Regras novas substituem as existentes com a mesma (causa, motivo)
+    by_key = {(canon(r["causa"]), canon(r["motivo"])): r for r in base}
+    for r in extras:
+        by_key[(canon(r["causa"]), canon(r["motivo"]))] = r
+    return list(by_key.values())
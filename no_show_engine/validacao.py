@@ -0,0 +1,106 @@
+# ------------------------------------------------------------
+# MÓDULO 1 — classificação de uma linha (sem Streamlit/pandas)
+# ------------------------------------------------------------
+import re
+
+from .mascaras import campos_invalidos, coluna_campo, detect_motivo_and_mask, lookup_rule
+from .normalizacao import canon, categoria_por_motivo
+from .regras import ESPECIAIS_NO_SHOW_CLIENTE, eh_especial_no_show_cliente
+
+def validar_linha(texto, valor_especial=None, rules_map: dict = None, validar_campos: bool = False) -> dict:
+    """Classifica o texto 'Causa. Motivo. Máscara...' de uma linha.
+
+    `valor_especial` é o valor da coluna especial (None quando não há coluna especial).
+    """
+    causa, motivo, mascara = detect_motivo_and_mask(texto, rules_map)
+    partes = [p for p in [str(causa).strip(), str(motivo).strip(), str(mascara).strip()] if p]
+    linha = {
+        "causa": causa,
+        "motivo": motivo,
+        "mascara": mascara,
+        "combo": " ".join(partes),
+        "mascara_modelo": "",
+        "resultado": "",
+        "detalhe": "",
+        "campos": {},
+    }
+
+    if valor_especial is not None and eh_especial_no_show_cliente(valor_especial):
+        linha["resultado"] = "No-show Cliente"
+        linha["detalhe"] = (
+            f"Regra especial aplicada: coluna especial = '{valor_especial}'. "
+            f"Gatilhos ativos: {', '.join(ESPECIAIS_NO_SHOW_CLIENTE)}"
+        )
+        return linha
+
+    found = lookup_rule((canon(causa), canon(motivo)), rules_map)
+    if not found:
+        linha["resultado"] = "No-show Técnico"
+        linha["detalhe"] = "Motivo não reconhecido nas regras embutidas."
+        return linha
+
+    _motivo_oficial, regex, modelo, nomes = found
+    linha["mascara_modelo"] = modelo or ""
+    mascara_norm = re.sub(r"\s+", " ", str(mascara)).strip()
+    m = regex.fullmatch(mascara_norm)
+    if not m:
+        linha["resultado"] = "No-show Técnico"
+        linha["detalhe"] = "Não casa com o modelo (mesmo no modo tolerante)."
+        return linha
+
+    # Placeholders capturados no próprio casamento (sem reprocessar o texto)
+    valores = [(v or "").strip(" .,;:-–—") for v in m.groups()]
+    linha["campos"] = {coluna_campo(n): v for n, v in zip(nomes, valores)}
+    invalidos = campos_invalidos(dict(zip(nomes, valores))) if validar_campos else []
+    if invalidos:
+        linha["resultado"] = "No-show Técnico"
+        linha["detalhe"] = "Campo(s) com formato inválido: " + ", ".join(invalidos)
+    else:
+        linha["resultado"] = "Máscara correta"
+    return linha
+
+def resultado_no_show(classificacao: str, motivo: str) -> str:
+    # Resultado No Show (4 categorias)
+    cat = categoria_por_motivo(motivo)
+    if cat:
+        return cat
+    if classificacao in ("Máscara correta", "No-show Cliente"):
+        return "No-show Cliente"
+    return "No-show Técnico"
+
+def validar_dataframe(df, col_main, col_especial=None, rules_map: dict = None, validar_campos: bool = False):
+    """Aplica validar_linha a todas as linhas.
+
+    Devolve (out, colunas de campos extraídos, colunas de entrada sobrescritas
+    por campos extraídos de mesmo nome).
+    """
+    import pandas as pd
+    linhas = [
+        validar_linha(
+            row.get(col_main, ""),
+            row.get(col_especial, "") if col_especial is not None else None,
+            rules_map,
+            validar_campos,
+        )
+        for _, row in df.iterrows()
+    ]
+
+    out = df.copy()
+    out["Causa detectada"] = [l["causa"] for l in linhas]
+    out["Motivo detectado"] = [l["motivo"] for l in linhas]
+    out["Máscara prestador (preenchida)"] = [l["mascara"] for l in linhas]
+    out["Máscara prestador"] = [l["mascara_modelo"] for l in linhas]
+    out["Causa. Motivo. Máscara (extra)"] = [l["combo"] for l in linhas]
+    out["Classificação No-show"] = [l["resultado"] for l in linhas]
+    out["Detalhe"] = [l["detalhe"] for l in linhas]
+
+    # Campos extraídos (uma coluna por placeholder/nome declarado)
+    df_campos = pd.DataFrame([l["campos"] for l in linhas], index=out.index).fillna("")
+    # Como as demais colunas geradas, substitui coluna de entrada com o mesmo nome
+    cols_campos = list(df_campos.columns)
+    sobrescritas = [c for c in cols_campos if c in out.columns]
+    for c in cols_campos:
+        out[c] = df_campos[c]
+
+    out["Resultado No Show"] = [resultado_no_show(l["resultado"], l["motivo"]) for l in linhas]
+    return out, cols_campos, sobrescritas
@@ -0,0 +1,67 @@
+"""Mede o custo de import e o cold start de workers (spawn) do motor de regras.
+
+Uso:
+    python scripts/bench_startup.py [--runs 5] [--workers 4] [--linhas 20000]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+AMOSTRAS = [
+    "Agendamento cancelado. Cancelada a Pedido do Cliente. Cliente João , contato via WhatsApp em 10/09 - 14:30, informou indisponibilidade para o atendimento.",
+    "Agendamento cancelado. Falta De Equipamento - Material. Atendimento não realizado por falta de chicote . Cliente Maria informado em 11/09 - 9h",
+    "Agendamento cancelado. No-show Técnico. Técnico Carlos , em 12/09 - 10:00, não realizou o atendimento por motivo de chuva",
+    "Texto livre sem motivo reconhecido",
+]
+
+def tempo_import(modulo: str, runs: int):
+    # Processo novo a cada execução: mede import a frio (inclui o interpretador)
+    tempos = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        r = subprocess.run([sys.executable, "-c", f"import {modulo}"], cwd=RAIZ, capture_output=True)
+        tempos.append(time.perf_counter() - t0)
+        if r.returncode != 0:
+            return None
+    return statistics.median(tempos)
+
+def _classificar(texto):
+    from no_show_engine import validar_linha
+    return validar_linha(texto)["resultado"]
+
+def cold_start_pool(workers: int, linhas: int):
+    ctx = mp.get_context("spawn")
+    textos = (AMOSTRAS * (linhas // len(AMOSTRAS) + 1))[:linhas]
+    t0 = time.perf_counter()
+    with ctx.Pool(workers) as pool:
+        pool.map(_classificar, AMOSTRAS * workers, chunksize=1)
+        t1 = time.perf_counter()
+        pool.map(_classificar, textos, chunksize=max(1, linhas // (workers * 8)))
+        t2 = time.perf_counter()
+    return t1 - t0, t2 - t1
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--linhas", type=int, default=20000)
+    args = ap.parse_args()
+
+    print("Import a frio (mediana, processo novo):")
+    for modulo in ["sys", "no_show_engine", "pandas", "streamlit", "app_validacao_no_show_ptbr"]:
+        t = tempo_import(modulo, args.runs)
+        print(f"  {modulo:<28} " + (f"{t * 1000:8.1f} ms" if t is not None else "   indisponível"))
+
+    partida, lote = cold_start_pool(args.workers, args.linhas)
+    print(f"Pool spawn ({args.workers} workers) até a 1ª resposta: {partida * 1000:.1f} ms")
+    print(f"{args.linhas} linhas com workers aquecidos: {lote * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()